@@ -0,0 +1,135 @@
+"""
+Numba compiled helper functions for copulas.
+
+numba is an optional dependency. If it is not installed, then ``has_numba``
+is False and callers need to use their generic code path.
+
+License: BSD-3
+
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+    has_numba = True
+except ImportError:
+    has_numba = False
+
+_SQRTH = math.sqrt(0.5)
+_LOG_SQRT_2PI = 0.5 * math.log(2 * math.pi)
+
+
+def _kendalltau_ranks(ranks, ties):
+    """Pairwise Kendall's tau-b from dense ranks of the variables.
+
+    Parameters
+    ----------
+    ranks : ndarray, (k, nobs), int64
+        Dense ranks, starting at zero, of each variable in rows.
+    ties : ndarray, (k,), int64
+        Number of tied pairs of observations for each variable.
+
+    Returns
+    -------
+    tau : ndarray, (k, k)
+        Symmetric matrix of Kendall's tau-b with ones on the diagonal.
+
+    Notes
+    -----
+    Discordant pairs are counted with a Fenwick tree over the ranks of the
+    second variable after sorting on the first variable. The sort order of a
+    variable without ties is computed only once and reused for all pairs.
+    """
+    k, n = ranks.shape
+    tot = n * (n - 1) // 2
+    tau = np.eye(k)
+    tree = np.empty(n + 1, dtype=np.int64)
+    for i in range(k - 1):
+        order_i = np.argsort(ranks[i], kind="mergesort")
+        for j in range(i + 1, k):
+            if ties[i] == tot or ties[j] == tot:
+                tau[i, j] = tau[j, i] = np.nan
+                continue
+            if ties[i] == 0:
+                order = order_i
+            else:
+                # break ties in variable i by variable j
+                order = np.argsort(ranks[i] * n + ranks[j], kind="mergesort")
+
+            tree[:] = 0
+            dis = 0
+            ntie = 0
+            run = 0
+            prev = -1
+            for m in range(n):
+                p = order[m]
+                key = ranks[i, p] * n + ranks[j, p]
+                if key == prev:
+                    run += 1
+                    ntie += run
+                else:
+                    run = 0
+                    prev = key
+                # previous observations with rank in j larger than current
+                r = ranks[j, p] + 1
+                q = r
+                n_le = 0
+                while q > 0:
+                    n_le += tree[q]
+                    q -= q & -q
+                dis += m - n_le
+                q = r
+                while q <= n:
+                    tree[q] += 1
+                    q += q & -q
+
+            con_minus_dis = tot - ties[i] - ties[j] + ntie - 2 * dis
+            tau_ij = (con_minus_dis / np.sqrt(tot - ties[i]) /
+                      np.sqrt(tot - ties[j]))
+            tau[i, j] = tau[j, i] = min(max(tau_ij, -1.), 1.)
+
+    return tau
+
+
+def _norm_cdf_logpdf(y, loc, scale, u_out, lpdf_out):
+    """cdf and sum of logpdf for normal marginal distributions.
+
+    Parameters
+    ----------
+    y : ndarray, (nobs, k), float64
+        Observations of the random variables in columns.
+    loc, scale : ndarray, (k,), float64
+        Parameters of the normal marginal distributions.
+    u_out : ndarray, (nobs, k), float64
+        Output array for the marginal cdf.
+    lpdf_out : ndarray, (nobs,), float64
+        Output array for the sum of the marginal logpdf in each row.
+
+    Notes
+    -----
+    The normal cdf is computed in the same way as ``scipy.special.ndtr``,
+    with ``erfc`` in the tails.
+    """
+    nobs, k = y.shape
+    for r in range(nobs):
+        acc = 0.
+        for i in range(k):
+            z = (y[r, i] - loc[i]) / scale[i]
+            x = z * _SQRTH
+            a = abs(x)
+            if a < _SQRTH:
+                u = 0.5 + 0.5 * math.erf(x)
+            else:
+                u = 0.5 * math.erfc(a)
+                if x > 0:
+                    u = 1. - u
+            u_out[r, i] = u
+            acc += -0.5 * z * z - _LOG_SQRT_2PI - math.log(scale[i])
+        lpdf_out[r] = acc
+
+
+if has_numba:
+    kendalltau_ranks = njit(cache=True)(_kendalltau_ranks)
+    norm_cdf_logpdf = njit(cache=True)(_norm_cdf_logpdf)
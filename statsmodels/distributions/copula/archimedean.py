@@ -252,6 +252,32 @@ class ClaytonCopula(ArchimedeanCopula):
         d = u.shape[-1]  # self.k_dim
         return (np.sum(u ** (-th), axis=-1) - d + 1) ** (-1.0 / th)
 
+    def cdfcond_2g1(self, u, args=()):
+        """Conditional cdf of second component given the value of first.
+        """
+        u = self._handle_u(u)
+        th, = self._handle_args(args)
+        if u.shape[-1] == 2:
+            # bivariate case
+            u1, u2 = u[..., 0], u[..., 1]
+            cdfc = u1 ** (-th - 1) * (u1 ** -th + u2 ** -th - 1) ** (
+                -1 / th - 1)
+            return cdfc
+        else:
+            raise NotImplementedError("u needs to be bivariate (2 columns)")
+
+    def ppfcond_2g1(self, q, u1, args=()):
+        """Conditional ppf of second component given the value of first.
+        """
+        u1 = np.asarray(u1)
+        th, = self._handle_args(args)
+        if u1.shape[-1] == 1:
+            # bivariate case, conditional on value of first variable
+            ppfc = ((q ** (-th / (1 + th)) - 1) * u1 ** -th + 1) ** (-1 / th)
+            return ppfc
+        else:
+            raise NotImplementedError("u needs to be bivariate (2 columns)")
+
     def tau(self, theta=None):
         # Joe 2014 p. 168
         if theta is None:
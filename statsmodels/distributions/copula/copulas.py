@@ -11,12 +11,212 @@ copulas. The Annals of Statistics, 37(5), pp.2990-3022.
 
 """
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+import os
 
 import numpy as np
-from scipy import stats
+from scipy import special, stats
+from scipy.stats.distributions import rv_frozen
 
 from statsmodels.graphics import utils
 
+# numba is imported only when a kernel is used, importing it is slow
+has_numba = find_spec("numba") is not None
+
+# minimum of nobs times number of pairs for the numba Kendall's tau, below
+# it the scipy version is fast and the jit compilation would dominate
+_KENDALLTAU_NUMBA_MIN = 1_000_000
+# minimum size of y for the numba cdf and logpdf of normal marginals
+_NORM_NUMBA_MIN = 1_000_000
+
+# ppf of the standardized location-scale marginals that can be evaluated
+# with a single ufunc call instead of the scipy distribution machinery
+_PPF_FAST = {
+    type(stats.norm): special.ndtri,
+    type(stats.expon): lambda q: -np.log1p(-q),
+    type(stats.uniform): lambda q: q,
+}
+
+_LOG_SQRT_2PI = 0.5 * np.log(2 * np.pi)
+
+
+def _cdf_logpdf_norm(z):
+    return special.ndtr(z), -0.5 * z * z - _LOG_SQRT_2PI
+
+
+def _cdf_logpdf_expon(z):
+    cdf = -np.expm1(-np.maximum(z, 0))
+    return cdf, np.where(z < 0, -np.inf, -z)
+
+
+def _cdf_logpdf_uniform(z):
+    lpdf = np.where((z < 0) | (z > 1), -np.inf, 0.)
+    # propagate nan
+    lpdf = np.where(np.isnan(z), z, lpdf)
+    return np.clip(z, 0, 1), lpdf
+
+
+# cdf and logpdf of the standardized location-scale marginals computed
+# jointly from the same standardized values
+_CDF_LOGPDF_FAST = {
+    type(stats.norm): _cdf_logpdf_norm,
+    type(stats.expon): _cdf_logpdf_expon,
+    type(stats.uniform): _cdf_logpdf_uniform,
+}
+
+
+def _loc_scale_fast(dist, args, registry):
+    """Look up the fast path of a location-scale marginal distribution.
+
+    Parameters
+    ----------
+    dist : scipy distribution instance
+        Marginal distribution, either frozen or not frozen.
+    args : tuple
+        Parameters of the marginal distribution, ``loc`` and ``scale``.
+    registry : dict
+        Maps the type of the distribution generator to the function for the
+        standardized distribution.
+
+    Returns
+    -------
+    fast : tuple or None
+        Tuple ``(func, loc, scale)``, or None if the distribution or its
+        parameters are not supported by the fast path. In that case the
+        distribution methods need to be used.
+    """
+    kwds = {}
+    if isinstance(dist, rv_frozen):
+        if len(args) > 0:
+            return None
+        args, kwds, dist = dist.args, dist.kwds, dist.dist
+    func = registry.get(type(dist))
+    if func is None:
+        return None
+    try:
+        _, loc, scale = dist._parse_args(*args, **kwds)
+    except TypeError:
+        return None
+    if not np.all(np.asarray(scale) > 0):
+        # let scipy handle invalid parameters
+        return None
+    return func, loc, scale
+
+
+def _numba_kernels():
+    """Module with the numba kernels, None if numba cannot be imported."""
+    if not has_numba:
+        return None
+    from statsmodels.distributions.copula import _numba_kernels
+    return _numba_kernels if _numba_kernels.has_numba else None
+
+
+def _kendalltau_matrix(x):
+    """Pairwise Kendall's tau-b for all columns of a 2-D array.
+
+    If numba is available and the data is large, then each column is ranked
+    only once and the discordant pairs are counted in a compiled loop.
+    Otherwise, this calls ``scipy.stats.kendalltau`` for each pair of columns
+    in a thread pool.
+
+    Parameters
+    ----------
+    x : ndarray, 2-D
+        Data with variables in columns.
+
+    Returns
+    -------
+    tau : ndarray, (k, k)
+        Symmetric matrix of Kendall's tau with ones on the diagonal.
+    """
+    x = np.asarray(x)
+    n, k = x.shape
+    pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+    kernels = None
+    if n * len(pairs) >= _KENDALLTAU_NUMBA_MIN and not np.isnan(x).any():
+        kernels = _numba_kernels()
+    if kernels is not None:
+        ranks = np.empty((k, n), dtype=np.int64)
+        ties = np.empty(k, dtype=np.int64)
+        for j in range(k):
+            _, inv, counts = np.unique(x[:, j], return_inverse=True,
+                                       return_counts=True)
+            ranks[j] = inv.ravel()
+            ties[j] = (counts * (counts - 1) // 2).sum()
+        return kernels.kendalltau_ranks(ranks, ties)
+
+    def _tau(ij):
+        return stats.kendalltau(x[:, ij[0]], x[:, ij[1]])[0]
+
+    # kendalltau spends most time in numpy and compiled code that release
+    # the GIL, so pairs can be computed in threads
+    n_workers = min(len(pairs), os.cpu_count() or 1)
+    if n_workers > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            taus = list(executor.map(_tau, pairs))
+    else:
+        taus = [_tau(ij) for ij in pairs]
+
+    tau = np.eye(k)
+    for (i, j), tau_ij in zip(pairs, taus):
+        tau[i, j] = tau[j, i] = tau_ij
+    return tau
+
+
+def _split_columns(y):
+    """Columns of the last axis of `y` as rows of a contiguous 2-D array."""
+    return np.ascontiguousarray(y.reshape(-1, y.shape[-1]).T)
+
+
+def _column_buffer(shape):
+    """Empty float64 array of `shape` with contiguous slices on the last axis.
+
+    The buffer is a view, ``u.reshape(-1, shape[-1])`` does not copy.
+    """
+    return np.moveaxis(np.empty((shape[-1],) + shape[:-1]), 0, -1)
+
+
+def _stack_marg_args(marg_args):
+    """Stack scalar parameters of identical marginals into arrays.
+
+    Returns None if the marginals have a different number of parameters or
+    if a parameter is not a scalar.
+    """
+    if len({len(args) for args in marg_args}) != 1:
+        return None
+    if any(np.ndim(a) != 0 for args in marg_args for a in args):
+        return None
+    return tuple(np.array(a) for a in zip(*marg_args))
+
+
+# factor to shrink uniform samples towards 0.5 in CopulaDistribution.rvs
+_SHRINK_U = 1 - 1e-10
+
+# bounds of the open unit interval used to clip u in Copula.logpdf
+_U_MIN = 1e-20
+_U_MAX = 1 - np.finfo(np.float64).epsneg
+
+# evaluation grids for ``Copula.plot_pdf`` keyed by ``(n_samples, eps)``
+_PLOT_GRID_CACHE = {}
+
+
+def _plot_grid(n_samples, eps):
+    """Meshgrid and stacked points on the unit square for plotting.
+
+    The arrays are cached and read-only.
+    """
+    key = (n_samples, eps)
+    grid = _PLOT_GRID_CACHE.get(key)
+    if grid is None:
+        uu, vv = np.meshgrid(np.linspace(eps, 1 - eps, n_samples),
+                             np.linspace(eps, 1 - eps, n_samples))
+        points = np.column_stack([uu.ravel(), vv.ravel()])
+        for arr in (uu, vv, points):
+            arr.setflags(write=False)
+        grid = _PLOT_GRID_CACHE[key] = (uu, vv, points)
+    return grid
+
 
 class CopulaDistribution:
     """Multivariate copula distribution
@@ -35,15 +235,73 @@ class CopulaDistribution:
     -----
     Status: experimental, argument handling may still change
 
+    Methods of the marginals and the implementation of some methods are
+    selected when ``copula`` or ``marginals`` are assigned. To change the
+    marginals, assign a new list instead of modifying it in place.
+
     """
     def __init__(self, copula, marginals, cop_args=()):
 
-        self.copula = copula
+        self._copula = copula
 
         # no checking done on marginals
-        self.marginals = marginals
+        self._marginals = marginals
         self.cop_args = cop_args
+        self._setup()
+
+    @property
+    def copula(self):
+        """Copula instance of the distribution."""
+        return self._copula
+
+    @copula.setter
+    def copula(self, copula):
+        self._copula = copula
+        self._setup()
+
+    @property
+    def marginals(self):
+        """List of marginal distributions."""
+        return self._marginals
+
+    @marginals.setter
+    def marginals(self, marginals):
+        self._marginals = marginals
+        self._setup()
+
+    def _setup(self):
+        """Cache marginal methods and select implementations.
+
+        This is called again if ``copula`` or ``marginals`` are replaced.
+        """
+        copula, marginals = self._copula, self._marginals
         self.k_vars = len(marginals)
+        self._norm_marginals = all(
+            type(getattr(m, "dist", m)) is type(stats.norm)
+            for m in marginals)
+        # bound methods of the marginals, resolved once
+        self._cdfs = [m.cdf for m in marginals]
+        self._logpdfs = [m.logpdf for m in marginals]
+        self._ppfs = [m.ppf for m in marginals]
+        # default marg_args, marginals without parameters
+        self._empty_margs = ((),) * self.k_vars
+        self._homogeneous = all(m is marginals[0] for m in marginals)
+        # avoid circular import
+        from statsmodels.distributions.copula.elliptical import GaussianCopula
+        self._gaussian_norm = (self._norm_marginals and
+                               isinstance(copula, GaussianCopula))
+
+        # select implementations once, they only change with the attributes
+        if self._gaussian_norm:
+            self._cdf_impl = self._cdf_gaussian
+        else:
+            self._cdf_impl = self._cdf_generic
+        if self._norm_marginals and has_numba:
+            self._cdf_logpdf_marginals = self._cdf_logpdf_norm
+        elif self._homogeneous:
+            self._cdf_logpdf_marginals = self._cdf_logpdf_homogeneous
+        else:
+            self._cdf_logpdf_marginals = self._cdf_logpdf_loop
 
     def rvs(self, nobs=1, cop_args=None, marg_args=None, random_state=None):
         """Draw `n` in the half-open interval ``[0, 1)``.
@@ -93,14 +351,17 @@ class CopulaDistribution:
         if cop_args is None:
             cop_args = self.cop_args
         if marg_args is None:
-            marg_args = [()] * self.k_vars
+            marg_args = self._empty_margs
 
         sample = self.copula.rvs(nobs=nobs, args=cop_args,
                                  random_state=random_state)
 
-        for i, dist in enumerate(self.marginals):
-            sample[:, i] = dist.ppf(0.5 + (1 - 1e-10) * (sample[:, i] - 0.5),
-                                    *marg_args[i])
+        # shrink uniform margins away from 0 and 1, inplace
+        sample -= 0.5
+        sample *= _SHRINK_U
+        sample += 0.5
+        for i in range(self.k_vars):
+            sample[:, i] = self._ppf_marginal(i, sample[:, i], marg_args[i])
         return sample
 
     def cdf(self, y, cop_args=None, marg_args=None):
@@ -132,17 +393,34 @@ class CopulaDistribution:
         if cop_args is None:
             cop_args = self.cop_args
         if marg_args is None:
-            marg_args = [()] * y.shape[-1]
-
-        cdf_marg = []
-        for i in range(self.k_vars):
-            cdf_marg.append(self.marginals[i].cdf(y[..., i], *marg_args[i]))
+            marg_args = self._empty_margs
+
+        return self._cdf_impl(y, cop_args, marg_args)
+
+    def _cdf_generic(self, y, cop_args, marg_args):
+        cols = _split_columns(y)
+        # each marginal writes into a contiguous column of the buffer
+        u = _column_buffer(y.shape)
+        u2 = u.reshape(-1, self.k_vars)
+        if all(len(args) == 0 for args in marg_args):
+            # no parameters, avoid unpacking empty args in each call
+            for i in range(self.k_vars):
+                np.copyto(u2[:, i], self._cdfs[i](cols[i]))
+        else:
+            for i in range(self.k_vars):
+                np.copyto(u2[:, i], self._cdfs[i](cols[i], *marg_args[i]))
 
-        u = np.column_stack(cdf_marg)
-        if y.ndim == 1:
-            u = u.squeeze()
         return self.copula.cdf(u, cop_args)
 
+    def _cdf_gaussian(self, y, cop_args, marg_args):
+        loc_scale = self._norm_loc_scale(marg_args)
+        if loc_scale is None:
+            return self._cdf_generic(y, cop_args, marg_args)
+        # Gaussian copula with normal marginals is multivariate normal
+        self.copula._handle_args(cop_args)
+        loc, scale = loc_scale
+        return self.copula.distr_mv.cdf((y - loc) / scale)
+
     def pdf(self, y, cop_args=None, marg_args=None):
         """PDF of copula distribution.
 
@@ -198,21 +476,108 @@ class CopulaDistribution:
         if cop_args is None:
             cop_args = self.cop_args
         if marg_args is None:
-            marg_args = tuple([()] * y.shape[-1])
-
-        lpdf = 0.0
-        cdf_marg = []
-        for i in range(self.k_vars):
-            lpdf += self.marginals[i].logpdf(y[..., i], *marg_args[i])
-            cdf_marg.append(self.marginals[i].cdf(y[..., i], *marg_args[i]))
-
-        u = np.column_stack(cdf_marg)
-        if y.ndim == 1:
-            u = u.squeeze()
+            marg_args = self._empty_margs
 
+        u, lpdf = self._cdf_logpdf_marginals(y, marg_args)
         lpdf += self.copula.logpdf(u, cop_args)
         return lpdf
 
+    def _ppf_marginal(self, i, q, args=()):
+        """ppf of marginal `i` using the fast path if available."""
+        fast = _loc_scale_fast(self.marginals[i], args, _PPF_FAST)
+        if fast is None:
+            if len(args) == 0:
+                return self._ppfs[i](q)
+            return self._ppfs[i](q, *args)
+        ppf, loc, scale = fast
+        return ppf(q) * scale + loc
+
+    def _cdf_logpdf_marginal(self, i, x, args=()):
+        """cdf and logpdf of marginal `i`.
+
+        Location-scale marginals with a fast path standardize `x` only once
+        and use it for both cdf and logpdf.
+        """
+        fast = _loc_scale_fast(self.marginals[i], args, _CDF_LOGPDF_FAST)
+        if fast is None:
+            if len(args) == 0:
+                return self._cdfs[i](x), self._logpdfs[i](x)
+            return self._cdfs[i](x, *args), self._logpdfs[i](x, *args)
+        func, loc, scale = fast
+        cdf, lpdf = func((x - loc) / scale)
+        return cdf, lpdf - np.log(scale)
+
+    def _norm_loc_scale(self, marg_args):
+        """loc and scale arrays of normal marginals.
+
+        Returns None if the parameters of a marginal are not scalars.
+        """
+        loc_scale = [_loc_scale_fast(m, a, _CDF_LOGPDF_FAST)
+                     for m, a in zip(self.marginals, marg_args)]
+        if not all(ls is not None and np.ndim(ls[1]) == 0 and
+                   np.ndim(ls[2]) == 0 for ls in loc_scale):
+            return None
+        loc = np.array([ls[1] for ls in loc_scale], dtype=np.float64)
+        scale = np.array([ls[2] for ls in loc_scale], dtype=np.float64)
+        return loc, scale
+
+    def _cdf_logpdf_loop(self, y, marg_args):
+        """Marginal cdf and sum of marginal logpdf.
+
+        This is the generic implementation of ``_cdf_logpdf_marginals``,
+        which is selected in ``__init__``.
+
+        Returns
+        -------
+        u : ndarray
+            Marginal cdf with the same shape as ``y``.
+        lpdf : ndarray
+            Sum of the marginal logpdf over the last axis of ``y``.
+        """
+        cols = _split_columns(y)
+        lpdf = 0.0
+        u = _column_buffer(y.shape)
+        u2 = u.reshape(-1, self.k_vars)
+        for i in range(self.k_vars):
+            cdf_i, lpdf_i = self._cdf_logpdf_marginal(i, cols[i],
+                                                      marg_args[i])
+            np.copyto(u2[:, i], cdf_i)
+            lpdf += lpdf_i
+        return u, np.reshape(lpdf, y.shape[:-1])
+
+    def _cdf_logpdf_homogeneous(self, y, marg_args):
+        """Marginal cdf and logpdf if all marginals are the same instance."""
+        args = _stack_marg_args(marg_args)
+        if args is None:
+            return self._cdf_logpdf_loop(y, marg_args)
+        # one call for all columns, parameters broadcast over columns
+        y2 = y.reshape(-1, self.k_vars)
+        u, lpdf = self._cdf_logpdf_marginal(0, y2, args)
+        return (np.reshape(u, y.shape),
+                np.sum(lpdf, axis=-1).reshape(y.shape[:-1]))
+
+    def _cdf_logpdf_norm(self, y, marg_args):
+        """Marginal cdf and logpdf of normal marginals using numba.
+
+        The numba kernel is only used for large ``y``, for small arrays the
+        jit compilation or loading of the kernel would dominate.
+        """
+        kernels = None
+        if y.size >= _NORM_NUMBA_MIN:
+            kernels = _numba_kernels()
+        loc_scale = self._norm_loc_scale(marg_args)
+        if kernels is None or loc_scale is None:
+            if self._homogeneous:
+                return self._cdf_logpdf_homogeneous(y, marg_args)
+            return self._cdf_logpdf_loop(y, marg_args)
+        y2 = np.ascontiguousarray(y.reshape(-1, self.k_vars),
+                                  dtype=np.float64)
+        loc, scale = loc_scale
+        u = np.empty(y2.shape)
+        lpdf = np.empty(y2.shape[0])
+        kernels.norm_cdf_logpdf(y2, loc, scale, u, lpdf)
+        return u.reshape(y.shape), lpdf.reshape(y.shape[:-1])
+
 
 class Copula(ABC):
     r"""A generic Copula class meant for subclassing.
@@ -338,8 +703,17 @@ class Copula(ABC):
         -------
         cdf : ndarray, (nobs, k_dim)
             Copula log-pdf evaluated at points ``u``.
+
+        Notes
+        -----
+        ``u`` is clipped to the open unit interval before evaluating the pdf,
+        so that the log-pdf does not become nan or -inf at the boundary of
+        the unit hypercube.
         """
-        return np.log(self.pdf(u, *args))
+        u = np.clip(np.asarray(u), _U_MIN, _U_MAX)
+        pdf = np.asarray(self.pdf(u, *args), dtype=np.float64)
+        np.log(pdf, out=pdf)
+        return pdf
 
     @abstractmethod
     def cdf(self, u, args=()):
@@ -436,13 +810,12 @@ class Copula(ABC):
         n_samples = 100
 
         eps = 1e-4
-        uu, vv = np.meshgrid(np.linspace(eps, 1 - eps, n_samples),
-                             np.linspace(eps, 1 - eps, n_samples))
-        points = np.vstack([uu.ravel(), vv.ravel()]).T
+        uu, vv, points = _plot_grid(n_samples, eps)
 
-        data = self.pdf(points).T.reshape(uu.shape)
-        min_ = np.nanpercentile(data, 5)
-        max_ = np.nanpercentile(data, 95)
+        data = np.ravel(self.pdf(points)).reshape(uu.shape)
+        # single precision is sufficient for the contour plot
+        data = data.astype(np.float32, copy=False)
+        min_, max_ = np.percentile(data[np.isfinite(data)], [5, 95])
 
         fig, ax = utils.create_mpl_ax(ax)
 
@@ -463,16 +836,44 @@ class Copula(ABC):
 
         return fig
 
-    def tau_simulated(self, nobs=1024, random_state=None):
+    def tau_simulated(self, nobs=1024, random_state=None, qmc=False):
         """Kendall's tau based on simulated samples.
 
+        Parameters
+        ----------
+        nobs : int, optional
+            Number of samples to generate from the copula.
+        random_state : {None, int, numpy.random.Generator}, optional
+            Seed or random number generator, see ``rvs``. If ``qmc`` is
+            True, then it is used to scramble the Sobol sequence.
+        qmc : bool, optional
+            If True, then the sample is generated from a scrambled Sobol
+            sequence that is transformed with the conditional ppf
+            ``ppfcond_2g1`` of the second variable given the first. The
+            estimate of tau converges faster than with pseudo-random samples,
+            so that a smaller ``nobs`` can be used. This requires a bivariate
+            copula that implements ``ppfcond_2g1``. The Sobol sequence is
+            drawn with the next power of 2 of ``nobs`` points and truncated
+            to ``nobs``, a power of 2 keeps its balance properties.
+            If False (default), then ``rvs`` is used.
+
         Returns
         -------
         tau : float
             Kendall's tau.
 
         """
-        x = self.rvs(nobs, random_state=random_state)
+        if qmc:
+            if self.k_dim != 2 or not hasattr(self, "ppfcond_2g1"):
+                raise NotImplementedError(
+                    "qmc requires a bivariate copula with ppfcond_2g1")
+            m = int(np.ceil(np.log2(nobs)))
+            sobol = stats.qmc.Sobol(d=2, seed=random_state)
+            q = sobol.random_base2(m)[:nobs]
+            u2 = self.ppfcond_2g1(q[:, 1:], q[:, :1])
+            x = np.column_stack([q[:, 0], np.ravel(u2)])
+        else:
+            x = self.rvs(nobs, random_state=random_state)
         return stats.kendalltau(x[:, 0], x[:, 1])[0]
 
     def fit_corr_param(self, data):
@@ -496,9 +897,8 @@ class Copula(ABC):
             tau = stats.kendalltau(x[:, 0], x[:, 1])[0]
         else:
             k = self.k_dim
-            taus = [stats.kendalltau(x[..., i], x[..., j])[0]
-                    for i in range(k) for j in range(i+1, k)]
-            tau = np.mean(taus)
+            taus = _kendalltau_matrix(x[:, :k])
+            tau = np.mean(taus[np.triu_indices(k, 1)])
         return self._arg_from_tau(tau)
 
     def _arg_from_tau(self, tau):
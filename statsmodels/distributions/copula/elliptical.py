@@ -7,11 +7,16 @@ License: BSD-3
 
 """
 import numpy as np
-from scipy import stats
+from scipy import linalg, special, stats
 # scipy compat:
 from statsmodels.compat.scipy import multivariate_t
 
-from statsmodels.distributions.copula.copulas import Copula
+from statsmodels.distributions.copula.copulas import (
+    _U_MAX,
+    _U_MIN,
+    Copula,
+    _kendalltau_matrix,
+)
 
 
 class EllipticalCopula(Copula):
@@ -112,12 +117,7 @@ class EllipticalCopula(Copula):
         if x.shape[1] == 2:
             tau = stats.kendalltau(x[:, 0], x[:, 1])[0]
         else:
-            k = self.k_dim
-            tau = np.eye(k)
-            for i in range(k):
-                for j in range(i+1, k):
-                    tau_ij = stats.kendalltau(x[..., i], x[..., j])[0]
-                    tau[i, j] = tau[j, i] = tau_ij
+            tau = _kendalltau_matrix(x[:, :self.k_dim])
 
         return self._arg_from_tau(tau)
 
@@ -188,6 +188,53 @@ class GaussianCopula(EllipticalCopula):
         self.distr_mv = stats.multivariate_normal(
             cov=corr, allow_singular=allow_singular)
 
+        # Cholesky factor and log determinant of corr for logpdf
+        if np.linalg.matrix_rank(self.corr) < self.corr.shape[0]:
+            self._chol = None
+        else:
+            self._chol = linalg.cholesky(self.corr, lower=True)
+            self._logdet = 2 * np.log(np.diag(self._chol)).sum()
+
+    def logpdf(self, u, args=()):
+        """Log of copula pdf, loglikelihood.
+
+        Parameters
+        ----------
+        u : array_like
+            Points of random variables in unit hypercube at which method is
+            evaluated.
+            The last dimension should be the same as the dimension of the
+            random variable.
+        args : tuple
+            Needs to be empty, copula parameters are set in the instance.
+
+        Returns
+        -------
+        logpdf : ndarray
+            Copula log-pdf evaluated at points ``u``.
+
+        Notes
+        -----
+        The log-pdf is computed in closed form,
+        ``-0.5 * q' (R^{-1} - I) q - 0.5 * log|R|`` with ``q = ppf(u)``,
+        which avoids the exp and log round trip of the pdf. The Cholesky
+        factor of the correlation matrix is computed when the instance is
+        created. ``u`` is clipped to the open unit interval as in
+        ``Copula.logpdf``. If the correlation matrix is singular, then the
+        generic method is used.
+        """
+        self._handle_args(args)
+        if self._chol is None:
+            return super().logpdf(u, args=args)
+
+        u = np.clip(np.asarray(u), _U_MIN, _U_MAX)
+        q = special.ndtri(u)
+        q2 = q.reshape(-1, q.shape[-1])
+        # q' R^{-1} q = ||L^{-1} q||^2 with the cached Cholesky factor L
+        z = linalg.solve_triangular(self._chol, q2.T, lower=True)
+        quad = np.einsum("ij,ij->j", z, z) - np.einsum("ij,ij->i", q2, q2)
+        return (-0.5 * quad - 0.5 * self._logdet).reshape(q.shape[:-1])
+
     def dependence_tail(self, corr=None):
         """
         Bivariate tail dependence parameter.
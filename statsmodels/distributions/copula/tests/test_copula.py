@@ -15,6 +15,8 @@ from numpy.testing import assert_allclose, assert_array_almost_equal
 import pytest
 from scipy import stats
 
+from statsmodels.distributions.copula import copulas
+from statsmodels.distributions.copula._numba_kernels import has_numba
 from statsmodels.distributions.copula.archimedean import (
     ArchimedeanCopula,
     ClaytonCopula,
@@ -356,6 +358,257 @@ def test_gev_genextreme(case):
     assert_allclose(pdfd, res2, rtol=1e-13)
 
 
+def test_copula_distr_rvs_marginals():
+    # fast ppf path for location-scale marginals agrees with scipy
+    marginals = [stats.norm(1, 2), stats.expon, stats.t(5)]
+    marg_args = [(), (0.5, 3), ()]
+    corr = np.full((3, 3), 0.5) + 0.5 * np.eye(3)
+    cop = GaussianCopula(corr=corr, k_dim=3)
+    cd = CopulaDistribution(cop, marginals)
+    rvs = cd.rvs(50, marg_args=marg_args, random_state=123)
+
+    u = cop.rvs(50, random_state=123)
+    u = 0.5 + (1 - 1e-10) * (u - 0.5)
+    for i, dist in enumerate(marginals):
+        assert_allclose(rvs[:, i], dist.ppf(u[:, i], *marg_args[i]),
+                        rtol=1e-13)
+
+
+def test_copula_distr_set_attributes():
+    # cached marginal methods follow reassigned marginals and copula
+    y = np.array([[0.5, 1.], [1.5, 2.2]])
+    cd = CopulaDistribution(GaussianCopula(corr=0.5), [stats.norm] * 2)
+    cd.marginals = [stats.t(5)] * 2
+    cd2 = CopulaDistribution(GaussianCopula(corr=0.5), [stats.t(5)] * 2)
+    assert_allclose(cd.logpdf(y), cd2.logpdf(y), rtol=1e-13)
+    assert_allclose(cd.cdf(y), cd2.cdf(y), rtol=1e-13)
+    assert_allclose(cd.rvs(5, random_state=1), cd2.rvs(5, random_state=1),
+                    rtol=1e-13)
+
+    cd.copula = FrankCopula(theta=2)
+    cd2 = CopulaDistribution(FrankCopula(theta=2), [stats.t(5)] * 2)
+    assert_allclose(cd.logpdf(y), cd2.logpdf(y), rtol=1e-13)
+    assert_allclose(cd.cdf(y), cd2.cdf(y), rtol=1e-13)
+
+
+@pytest.mark.parametrize("marginals, params", [
+    ([stats.norm, stats.norm], [0., 1., 0.5, 2.]),
+    ([stats.gamma, stats.t], [2., 0., 3., 0.]),
+    ([stats.genextreme, stats.genextreme], [0., 0.1]),
+    ([stats.norm(1, 2), stats.t(5)], []),
+    ])
+def test_copula_distr_marg_args_ndarray(marginals, params):
+    # marg_args as arrays, e.g. from np.split of a parameter vector
+    marg_args = np.split(np.array(params), 2)
+    marg_args_tuple = [tuple(a) for a in marg_args]
+    cd = CopulaDistribution(FrankCopula(theta=2), marginals)
+    y = np.array([[0.5, 1.], [1.5, 2.2]])
+
+    # truth value of an empty array is deprecated in numpy
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        assert_allclose(cd.cdf(y, marg_args=marg_args),
+                        cd.cdf(y, marg_args=marg_args_tuple), rtol=1e-13)
+        assert_allclose(cd.logpdf(y, marg_args=marg_args),
+                        cd.logpdf(y, marg_args=marg_args_tuple), rtol=1e-13)
+        assert_allclose(cd.rvs(5, marg_args=marg_args, random_state=1),
+                        cd.rvs(5, marg_args=marg_args_tuple, random_state=1),
+                        rtol=1e-13)
+
+
+def test_copula_distr_logpdf_marginals():
+    # fast cdf and logpdf path for location-scale marginals agrees with
+    # evaluating marginals with scipy
+    marginals = [stats.norm(1, 2), stats.expon, stats.uniform(-1, 2),
+                 stats.t(5)]
+    marg_args = [(), (0.5, 3), (), ()]
+    cop = ClaytonCopula(theta=1.5, k_dim=4)
+    cd = CopulaDistribution(cop, marginals)
+    y = np.array([[0.5, 1., 0.3, -0.2],
+                  [-1.5, 4., -0.9, 1.5],
+                  [2., 2.2, 0.7, 0.]])
+
+    u = np.column_stack([dist.cdf(y[:, i], *marg_args[i])
+                         for i, dist in enumerate(marginals)])
+    lpdf_marg = sum(dist.logpdf(y[:, i], *marg_args[i])
+                    for i, dist in enumerate(marginals))
+    res1 = lpdf_marg + cop.logpdf(u)
+    res = cd.logpdf(y, marg_args=marg_args)
+    assert_allclose(res, res1, rtol=1e-13)
+    assert res.shape == (3,)
+
+    res = cd.logpdf(y[1], marg_args=marg_args)
+    assert_allclose(res, res1[1], rtol=1e-13)
+    assert res.shape == ()
+
+    res = cd.logpdf(np.stack([y, y[::-1]]), marg_args=marg_args)
+    assert_allclose(res, [res1, res1[::-1]], rtol=1e-13)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_copula_distr_logpdf_norm(use_numba, monkeypatch):
+    if use_numba and not has_numba:
+        pytest.skip("numba not available")
+    monkeypatch.setattr(copulas, "has_numba", use_numba)
+    monkeypatch.setattr(copulas, "_NORM_NUMBA_MIN", 0)
+
+    marginals = [stats.norm, stats.norm(1, 2), stats.norm]
+    marg_args = [(0.5, 3), (), ()]
+    cop = FrankCopula(theta=2, k_dim=3)
+    cd = CopulaDistribution(cop, marginals)
+    y = np.array([[0.5, 1., -0.2],
+                  [-1.5, 4., 1.5],
+                  [9., -6., 40.],
+                  [np.nan, 0., 0.]])
+
+    u = np.column_stack([dist.cdf(y[:, i], *marg_args[i])
+                         for i, dist in enumerate(marginals)])
+    lpdf_marg = sum(dist.logpdf(y[:, i], *marg_args[i])
+                    for i, dist in enumerate(marginals))
+    u1, lpdf1 = cd._cdf_logpdf_marginals(y, marg_args)
+    assert_allclose(u1, u, rtol=1e-13)
+    assert_allclose(lpdf1, lpdf_marg, rtol=1e-13)
+
+    res = cd.logpdf(y[1], marg_args=marg_args)
+    assert_allclose(res, lpdf_marg[1] + cop.logpdf(u[1]), rtol=1e-13)
+    assert res.shape == ()
+
+
+def test_copula_distr_logpdf_norm_fallback(monkeypatch):
+    # identical normal marginals fall back to the batched homogeneous path
+    monkeypatch.setattr(copulas, "has_numba", True)
+    monkeypatch.setattr(copulas, "_numba_kernels", lambda: None)
+    cd = CopulaDistribution(FrankCopula(theta=2), [stats.norm, stats.norm])
+    calls = []
+
+    def homogeneous(y, marg_args):
+        calls.append(marg_args)
+        return CopulaDistribution._cdf_logpdf_homogeneous(cd, y, marg_args)
+
+    monkeypatch.setattr(cd, "_cdf_logpdf_homogeneous", homogeneous)
+    y = np.array([[0.5, 1.], [-1.5, 4.]])
+    marg_args = [(0.5, 3), (1, 2)]
+    u1, lpdf1 = cd._cdf_logpdf_marginals(y, marg_args)
+    u, lpdf = cd._cdf_logpdf_loop(y, marg_args)
+    assert len(calls) == 1
+    assert_allclose(u1, u, rtol=1e-13)
+    assert_allclose(lpdf1, lpdf, rtol=1e-13)
+
+
+@pytest.mark.parametrize("marg_args", [
+    [(0.1, 0, 1), (0.2, 1, 2), (-0.1, 0.5, 1)],
+    [(0.1,), (0.2, 1, 2), (-0.1, 0.5)],
+    None,
+    ])
+def test_copula_distr_logpdf_homogeneous(marg_args):
+    # same marginal distribution with different parameters
+    gev = stats.genextreme
+    cop = ClaytonCopula(theta=1.5, k_dim=3)
+    if marg_args is None:
+        gev = stats.genextreme(0.1)
+        margs = [()] * 3
+    else:
+        margs = marg_args
+    cd = CopulaDistribution(cop, [gev] * 3)
+    assert cd._homogeneous
+    y = np.array([[0.5, 1., -0.2],
+                  [-1.5, 4., 1.5],
+                  [2., 0.2, 0.7]])
+
+    u = np.column_stack([gev.cdf(y[:, i], *margs[i]) for i in range(3)])
+    lpdf_marg = sum(gev.logpdf(y[:, i], *margs[i]) for i in range(3))
+    res1 = lpdf_marg + cop.logpdf(u)
+    res = cd.logpdf(y, marg_args=marg_args)
+    assert_allclose(res, res1, rtol=1e-13)
+    assert res.shape == (3,)
+
+    res = cd.logpdf(y[1], marg_args=marg_args)
+    assert_allclose(res, res1[1], rtol=1e-13)
+    assert res.shape == ()
+
+
+def test_copula_distr_cdf_gaussian():
+    # Gaussian copula with normal marginals is multivariate normal
+    corr = np.array([[1, 0.5, 0.2], [0.5, 1, -0.3], [0.2, -0.3, 1]])
+    cop = GaussianCopula(corr=corr, k_dim=3)
+    marginals = [stats.norm, stats.norm(1, 2), stats.norm]
+    marg_args = [(0.5, 3), (), ()]
+    cd = CopulaDistribution(cop, marginals)
+    assert cd._gaussian_norm
+    y = np.array([[0.5, 1., -0.2],
+                  [-1.5, 4., 1.5],
+                  [2., -1., 0.3]])
+
+    loc = np.array([0.5, 1, 0])
+    scale = np.array([3, 2, 1])
+    cov = corr * np.outer(scale, scale)
+    res1 = stats.multivariate_normal(loc, cov).cdf(y)
+    res = cd.cdf(y, marg_args=marg_args)
+    assert_allclose(res, res1, atol=1e-5)
+    assert res.shape == (3,)
+
+    u = np.column_stack([dist.cdf(y[:, i], *marg_args[i])
+                         for i, dist in enumerate(marginals)])
+    assert_allclose(res, cop.cdf(u), atol=1e-5)
+
+    res = cd.cdf(y[1], marg_args=marg_args)
+    assert_allclose(res, res1[1], atol=1e-5)
+    assert res.shape == ()
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_kendalltau_matrix(use_numba, monkeypatch):
+    if use_numba and not has_numba:
+        pytest.skip("numba not available")
+    monkeypatch.setattr(copulas, "has_numba", use_numba)
+    monkeypatch.setattr(copulas, "_KENDALLTAU_NUMBA_MIN", 0)
+    # use thread pool in scipy fallback also on single core machines
+    monkeypatch.setattr(copulas.os, "cpu_count", lambda: 4)
+
+    rng = np.random.default_rng(9876)
+    x = rng.standard_normal((200, 4))
+    x[:, 1] += x[:, 0]
+    x[:, 3] -= x[:, 1]
+    for xi in [x, np.round(x)]:
+        tau = copulas._kendalltau_matrix(xi)
+        for i in range(4):
+            for j in range(4):
+                tau_ij = stats.kendalltau(xi[:, i], xi[:, j])[0]
+                assert_allclose(tau[i, j], tau_ij, rtol=1e-13)
+
+    # constant column
+    x[:, 2] = 1
+    tau = copulas._kendalltau_matrix(x)
+    assert np.isnan(tau[2, [0, 1, 3]]).all()
+    assert_allclose(tau[0, 1], stats.kendalltau(x[:, 0], x[:, 1])[0],
+                    rtol=1e-13)
+
+
+@pytest.mark.matplotlib
+def test_plot_pdf(close_figures):
+    cop = FrankCopula(theta=2)
+    cop.plot_pdf()
+    uu, vv, points = copulas._plot_grid(100, 1e-4)
+    assert copulas._plot_grid(100, 1e-4)[2] is points
+    assert points.shape == (10000, 2)
+    assert_allclose(points[:, 0], uu.ravel())
+    assert_allclose(points[:, 1], vv.ravel())
+
+    # second call uses the cached grid
+    cop.plot_pdf()
+
+
+@pytest.mark.parametrize("cop", [GaussianCopula(0.5), StudentTCopula(0.5, 5),
+                                 IndependenceCopula()])
+def test_logpdf_boundary(cop):
+    u = np.array([[0.3, 0.4], [0.9, 0.2]])
+    assert_allclose(cop.logpdf(u), np.log(cop.pdf(u)), rtol=1e-13)
+
+    # u at the boundary of the unit square is clipped
+    u = np.array([[0, 0.5], [1, 1], [0, 1]])
+    assert np.isfinite(cop.logpdf(u)).all()
+
+
 class TestFrank:
     def test_basic(self):
         case = [tra.TransfFrank, 0.5, 0.9, (2,), 0.4710805107852225,
@@ -397,6 +650,53 @@ class TestFrank:
         assert_allclose(taud, tau_cop, rtol=1e-5)
 
 
+@pytest.mark.parametrize("k_dim", [2, 3])
+def test_gaussian_logpdf(k_dim):
+    corr = np.array([[1, 0.5, 0.2], [0.5, 1, -0.3], [0.2, -0.3, 1]])
+    cop = GaussianCopula(corr=corr[:k_dim, :k_dim], k_dim=k_dim)
+    u = np.random.default_rng(5436).random((10, k_dim))
+    res = cop.logpdf(u)
+    assert_allclose(res, np.log(cop.pdf(u)), rtol=1e-12)
+    assert res.shape == (10,)
+    res = cop.logpdf(u[0])
+    assert_allclose(res, np.log(cop.pdf(u[0])), rtol=1e-12)
+    assert res.shape == ()
+
+    # tail value where pdf would underflow
+    u = np.full(k_dim, 1e-300)
+    u[0] = 1 - 1e-16
+    assert np.isfinite(cop.logpdf(u))
+
+    cop = GaussianCopula(corr=1, allow_singular=True)
+    u = [[0.3, 0.3]]
+    assert_allclose(cop.logpdf(u), np.log(cop.pdf(u)), rtol=1e-12)
+
+
+@pytest.mark.parametrize("cop", [FrankCopula(theta=3), ClaytonCopula(theta=2)])
+def test_tau_simulated_qmc(cop):
+    u1 = np.array([[0.3], [0.9]])
+    q = np.array([[0.2], [0.7]])
+    u2 = cop.ppfcond_2g1(q, u1)
+    assert_allclose(cop.cdfcond_2g1(np.column_stack([u1, u2])), q.ravel(),
+                    rtol=1e-13)
+
+    tau = cop.tau_simulated(nobs=1024, random_state=0, qmc=True)
+    assert_allclose(tau, cop.tau(), rtol=0.02)
+    tau2 = cop.tau_simulated(nobs=1024, random_state=0, qmc=True)
+    assert tau2 == tau
+
+    # nobs that is not a power of 2 does not warn about balance properties
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", UserWarning)
+        tau3 = cop.tau_simulated(nobs=1000, random_state=0, qmc=True)
+    assert_allclose(tau3, cop.tau(), rtol=0.02)
+
+
+def test_tau_simulated_qmc_raise():
+    with pytest.raises(NotImplementedError):
+        GumbelCopula(theta=2).tau_simulated(qmc=True)
+
+
 # The reference results are coming from the R package Copula.
 # See ``copula_r_tests.rst`` for more details.
 
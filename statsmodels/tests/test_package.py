@@ -15,6 +15,18 @@ def test_lazy_imports():
     assert rc == 0
 
 
+def test_lazy_imports_numba():
+    # numba is only imported when a numba kernel is used
+    cmd = ("import statsmodels.distributions.copula.api; "
+           "import sys; "
+           "assert 'numba' not in sys.modules")
+    cmd = sys.executable + ' -c "' + cmd + '"'
+    p = subprocess.Popen(cmd, shell=True, close_fds=True)
+    p.wait()
+    rc = p.returncode
+    assert rc == 0
+
+
 def test_docstring_optimization_compat():
     # GH#5235 check that importing with stripped docstrings does not raise
     cmd = sys.executable + ' -OO -c "import statsmodels.api as sm"'